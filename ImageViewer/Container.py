@@ -4,12 +4,35 @@ from typing import Optional
 
 from PIL import Image
 from pyglet.sprite import Sprite
-from pyglet.graphics import Batch
+from pyglet.graphics import Batch, Group
 from pyglet.image import ImageData
 from pyglet.shapes import Line
 from pyglet.text import Label
 
 class Container():
+    # Slots for every instance attribute, dropping the per-instance dict to shrink the
+    # thousands of containers a big folder creates and speed up attribute access
+    __slots__ = (
+        '_path',
+        'batch',
+        'spriteGroup',
+        'overlayGroup',
+        'thumbnailCache',
+        'sprite',
+        '_x',
+        '_y',
+        'screenHeight',
+        'imageLoaded',
+        'imageLoading',
+        'toTS',
+        'lock',
+        'label',
+        '_drawGridLines',
+        'gridLines',
+        '_highlighted',
+        '_bounds',
+    )
+
     # Load the default image
     thumbnailInputImage = Image.open(Path('ImageViewer/Resources/Loading Icon.png'))
 
@@ -31,13 +54,22 @@ class Container():
     # Set the folder image to None
     folderImage = None
 
-    def __init__(self, x: int, y: int, screenHeight: int, batch: Batch, toTS: queue.Queue, lock):
+    def __init__(self, x: int, y: int, screenHeight: int, batch: Batch, toTS: queue.Queue, lock, spriteGroup: Optional[Group] = None, overlayGroup: Optional[Group] = None, thumbnailCache: Optional[dict] = None):
         # The path this thumbnail represents
         self._path: Path = Path()
 
         # Set the batch
         self.batch = batch
 
+        # The shared group for all thumbnail sprites, so the batch can merge their draws
+        self.spriteGroup = spriteGroup
+
+        # The shared group drawn above the sprites for labels and gridlines
+        self.overlayGroup = overlayGroup
+
+        # The browser's cache of decoded thumbnails, checked before requesting from disk
+        self.thumbnailCache = thumbnailCache
+
         # Initially set the sprite to None
         self.sprite = None
 
@@ -74,6 +106,9 @@ class Container():
         # Indicate whether this image is highlighted
         self._highlighted = False
 
+        # Cached sprite bounds as an (x0, y0, x1, y1) tuple for fast hit testing
+        self._bounds: Optional[tuple[int, int, int, int]] = None
+
     @classmethod
     def setContainerSize(cls, size: int) -> None:
         # If we have not yet created an image for the loading sprite
@@ -98,6 +133,14 @@ class Container():
 
     @classmethod
     def CreateThumbnailSprite(cls, thumbnail: Image.Image) -> ImageData:
+        # Upload opaque images as 3 byte RGB rather than 4 byte RGBA to reduce the texture
+        # upload bandwidth, keeping the alpha channel only where the image actually has one
+        if thumbnail.mode not in ('RGB', 'RGBA'):
+            if 'A' in thumbnail.mode or 'transparency' in thumbnail.info:
+                thumbnail = thumbnail.convert('RGBA')
+            else:
+                thumbnail = thumbnail.convert('RGB')
+
         # Get the mode (e.g., 'RGBA')
         mode = thumbnail.mode
 
@@ -110,6 +153,20 @@ class Container():
         # Create a Pyglet ImageData object from the bytes
         return ImageData(thumbnail.width, thumbnail.height, mode, rawImage, -thumbnail.width * formatLength)
 
+    def Reset(self, x: int, y: int) -> None:
+        # Return this container to a clean state at a new position ready for reuse,
+        # the GL objects are deleted so the next path starts from a fresh sprite and label
+        self.delete()
+
+        # Clear the state flags
+        self._highlighted = False
+        self.imageLoaded = False
+        self.imageLoading = False
+
+        # Move straight to the new position, there is nothing left to translate
+        self._x = x
+        self._y = y
+
     def InitialiseSprite(self) -> None:
         # Delete the sprite if it exists
         if self.sprite:
@@ -119,10 +176,10 @@ class Container():
         # Check whther this is a file or folder and set the thumbnail appropriately
         if self._path.is_dir():
             # Set the sprite
-            self.sprite = Sprite(self.folderImage, batch=self.batch)
+            self.sprite = Sprite(self.folderImage, batch=self.batch, group=self.spriteGroup)
         else:
             # Set the sprite
-            self.sprite = Sprite(self.thumbnailImage, batch=self.batch)
+            self.sprite = Sprite(self.thumbnailImage, batch=self.batch, group=self.spriteGroup)
 
             # Make the sprite mostly transparent for the loading image
             self.sprite.opacity = 64
@@ -135,28 +192,37 @@ class Container():
         self.sprite.x = self.x + self.marginPix + xShift
         self.sprite.y = self.y + self.marginPix + yShift
 
+        # Cache the new sprite bounds
+        self._UpdateBounds()
+
         if self.label is None:
             # Work out the centre x and y of the label
             xlabel = self.x + (self.containerSize / 2)
             ylabel = self.y + (self.marginPix / 2)
 
-            # Get the stem, only getting the first and last ten characters if the filename is longer than 23 characters
-            labelText = self._path.stem if len(self._path.stem) <= 23 else f'{self._path.stem[:10]}...{self._path.stem[-10:]}'
+            # Get the stem once, only keeping the first and last ten characters if the filename is longer than 23 characters
+            stem = self._path.stem
+            labelText = stem if len(stem) <= 23 else f'{stem[:10]}...{stem[-10:]}'
 
-            # Create the label using the centre anchor position
-            self.label = Label(labelText, x=xlabel, y=ylabel, anchor_x='center', anchor_y='center', batch=self.batch)
+            # Create the label using the centre anchor position, naming the font explicitly so pyglet
+            # resolves it once rather than re-looking it up for every label
+            self.label = Label(labelText, font_name='Arial', x=xlabel, y=ylabel, anchor_x='center', anchor_y='center', batch=self.batch, group=self.overlayGroup)
 
         if not self.gridLines:
             # Add gridlines to the gridline list
-            self.gridLines.append(Line(self.x, self.y, self.x, self.y + self.containerSize, batch=self.batch))
-            self.gridLines.append(Line(self.x, self.y + self.containerSize, self.x + self.containerSize, self.y + self.containerSize, batch=self.batch))
-            self.gridLines.append(Line(self.x + self.containerSize, self.y + self.containerSize, self.x + self.containerSize, self.y, batch=self.batch))
-            self.gridLines.append(Line(self.x + self.containerSize, self.y, self.x, self.y, batch=self.batch))
+            self.gridLines.append(Line(self.x, self.y, self.x, self.y + self.containerSize, batch=self.batch, group=self.overlayGroup))
+            self.gridLines.append(Line(self.x, self.y + self.containerSize, self.x + self.containerSize, self.y + self.containerSize, batch=self.batch, group=self.overlayGroup))
+            self.gridLines.append(Line(self.x + self.containerSize, self.y + self.containerSize, self.x + self.containerSize, self.y, batch=self.batch, group=self.overlayGroup))
+            self.gridLines.append(Line(self.x + self.containerSize, self.y, self.x, self.y, batch=self.batch, group=self.overlayGroup))
 
             # Show or hide the gridlines
             for gridLine in self.gridLines:
                 gridLine.visible = self._drawGridLines
 
+        # Reapply the highlight in case this container was created after being highlighted
+        if self._highlighted:
+            self.highlighted = True
+
     @property
     def drawGridLines(self) -> bool:
         return self._drawGridLines
@@ -217,14 +283,28 @@ class Container():
             self.sprite.x = self.x + self.marginPix + xShift
             self.sprite.y = self.y + self.marginPix + yShift
 
+            # Cache the new sprite bounds
+            self._UpdateBounds()
+
+    def _UpdateBounds(self) -> None:
+        # Cache the sprite bounds as a plain tuple so hit testing avoids going through
+        # pyglet's Sprite property machinery on every check
+        if self.sprite:
+            x0 = self.sprite.x
+            y0 = self.sprite.y
+            self._bounds = (x0, y0, x0 + self.sprite.width, y0 + self.sprite.height)
+        else:
+            self._bounds = None
+
     def visible(self) -> bool:
         # Returns True if any part of the sprite is on screen
         return (self._y >= 0 and self._y < self.screenHeight) or (self._y + self.containerSize >= 0 and self._y + self.containerSize < self.screenHeight)
 
     def InSprite(self, x: int, y: int) -> bool:
         # Return true if the click was inside the image (not container) bounds
-        if self.sprite:
-            return x >= self.sprite.x and y >= self.sprite.y and x <= self.sprite.x + self.sprite.width and y <= self.sprite.y + self.sprite.height
+        if self._bounds:
+            x0, y0, x1, y1 = self._bounds
+            return x0 <= x <= x1 and y0 <= y <= y1
         else:
             return False
 
@@ -237,10 +317,8 @@ class Container():
         # Set the path
         self._path = path
 
-        # Initialise the sprite now we know the path
-        self.InitialiseSprite()
-
-        # Trigger off the thumbnail server to get the thumbnail
+        # Trigger off the sprite creation and thumbnail fetch, _updateSprite only creates
+        # the sprite, label and gridlines once the container is actually on screen
         self._updateSprite()
 
     def _updateSprite(self) -> None:
@@ -253,13 +331,21 @@ class Container():
                 # Show that the image has been loaded so we only request it once
                 self.imageLoaded = True
 
-                # Show that an image is being loaded so that a timer gets triggered to check for a response
-                self.imageLoading = True
-
-                # Send a request to load the image at path, self._path is sent to allow matching the image to the container map
-                # A queue can only have one thread access a particular end, otherwise the data will be corrupt
-                with self.lock:
-                    self.toTS.put_nowait((self._path, self.imageSize))
+                # Use the cached thumbnail if the browser already has it decoded
+                cachedImage = self.thumbnailCache.get(self._path) if self.thumbnailCache is not None else None
+
+                if cachedImage is not None:
+                    # Mark the cache entry as recently used and skip the disk request entirely
+                    self.thumbnailCache.move_to_end(self._path)
+                    self.ReceiveImage(cachedImage)
+                else:
+                    # Show that an image is being loaded so that a timer gets triggered to check for a response
+                    self.imageLoading = True
+
+                    # Send a request to load the image at path, self._path is sent to allow matching the image to the container map
+                    # A queue can only have one thread access a particular end, otherwise the data will be corrupt
+                    with self.lock:
+                        self.toTS.put_nowait((self._path, self.imageSize))
         else:
             # Set the image loaded and image loading variables to False
             self.imageLoaded = False
@@ -268,61 +354,61 @@ class Container():
             # Clear the sorite, label and gridlines
             self.delete()
 
-    @property
-    def x(self) -> int:
-        return self._x
-
-    @x.setter
-    def x(self, x: int) -> None:
-        # Work out the scroll amount
-        scroll = x - self._x
+    def set_position(self, x: int, y: int) -> None:
+        # Work out the scroll amount in each axis
+        dx = x - self._x
+        dy = y - self._y
 
-        # Move the sprite in x
+        # Move the sprite with a single update call so its vertices are rebuilt once
         if self.sprite:
-            self.sprite.x += scroll
+            self.sprite.update(x=self.sprite.x + dx, y=self.sprite.y + dy)
 
-        # Move the label in x
+        # Move the label
         if self.label:
-            self.label.x += scroll
+            self.label.x += dx
+            self.label.y += dy
 
         # Move the gridlines
         for gridLine in self.gridLines:
-            gridLine.x += scroll
-            gridLine.x2 += scroll
+            gridLine.x += dx
+            gridLine.x2 += dx
+            gridLine.y += dy
+            gridLine.y2 += dy
 
-        # Move the container in x
+        # Move the container
         self._x = x
+        self._y = y
+
+        # Shift the cached sprite bounds by the same amount
+        if self._bounds:
+            x0, y0, x1, y1 = self._bounds
+            self._bounds = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
 
-        # Load the image if it is now visible and wasn't before
+        # Load the image if it is now visible and wasn't before, once for both axes
         self._updateSprite()
 
+    def scrollBy(self, dy: int) -> None:
+        # Scroll the container vertically, this is set_position specialised for the scroll
+        # path where only y changes
+        self.set_position(self._x, self._y + dy)
+
+    @property
+    def x(self) -> int:
+        return self._x
+
+    @x.setter
+    def x(self, x: int) -> None:
+        # Move the container in x only
+        self.set_position(x, self._y)
+
     @property
     def y(self) -> int:
         return self._y
 
     @y.setter
     def y(self, y: int) -> None:
-        # Work out the scroll amount
-        scroll = y - self._y
-
-        # Move the sprite in y
-        if self.sprite:
-            self.sprite.y += scroll
-
-        # Move the label in x
-        if self.label:
-            self.label.y += scroll
-
-        # Move the gridlines
-        for gridLine in self.gridLines:
-            gridLine.y += scroll
-            gridLine.y2 += scroll
-
-        # Move the container in y
-        self._y = y
-
-        # Load the image if it is now visible and wasn't before
-        self._updateSprite()
+        # Move the container in y only
+        self.set_position(self._x, y)
 
     def delete(self) -> None:
         # Delete the sprite
@@ -330,6 +416,9 @@ class Container():
             self.sprite.delete()
             self.sprite = None
 
+        # Clear the cached sprite bounds
+        self._bounds = None
+
         # Delete the label
         if self.label:
             self.label.delete()
@@ -1,4 +1,6 @@
+from collections import OrderedDict
 import logging
+import os
 from pathlib import Path
 import threading
 import queue
@@ -6,13 +8,17 @@ from typing import Callable, Optional
 
 import pyglet
 from pyglet.window import key, mouse, Window
-from pyglet.graphics import Batch
+from pyglet.graphics import Batch, OrderedGroup
 from pyglet.image import ImageData
 
 from ImageViewer.FileTypes import supportedExtensions
 from ImageViewer.ThumbnailServer import ThumbnailServer
 from ImageViewer.Container import Container
 
+# The supported extensions (without the leading dot) as a frozenset, so the per-file
+# suffix check is a single hashed membership test rather than a linear scan
+_SUPPORTED_EXT = frozenset(extension.lstrip('.') for extension in supportedExtensions.values())
+
 class FileBrowser():
     def __init__(self, inputPath: Path, mainWindow: Window, loadFunction: Callable[[Path], None], logQueue: queue.Queue) -> None:
 
@@ -57,15 +63,40 @@ class FileBrowser():
         # The batch to insert the sprites
         self.batch = Batch()
 
+        # Shared ordered groups so every thumbnail sprite sits in one group and the labels
+        # and gridlines in another, letting the batch merge draws rather than interleave them
+        self.spriteGroup = OrderedGroup(0)
+        self.overlayGroup = OrderedGroup(1)
+
         # Constant defining the number of thnumbnails in a row
         self.thumbnailsPerRow = 8
 
         # The dict of thumbnails indexed by Path
         self.thumbnailDict: dict[Path, Container] = {}
 
+        # The containers in display order, for O(1) indexed access without rebuilding a list
+        self.thumbnailList: list[Container] = []
+
+        # Pool of containers reused across folder changes, sprite and vertex allocation is
+        # the expensive part of a rebuild so the objects are kept and just repointed
+        self.containerPool: list[Container] = []
+
+        # Bounded cache of decoded thumbnails so revisiting a folder skips the disk and decode
+        self.thumbnailCache: OrderedDict[Path, ImageData] = OrderedDict()
+
+        # The maximum number of thumbnails to keep in the cache
+        self.maxCachedThumbnails = 1024
+
         # Store the index of the image which is highlighted
         self.highlightedImageIndex = 0
 
+        # Indicate whether a check for images from the thumbnail server is already scheduled
+        self.receivePending = False
+
+        # Accumulated mouse scroll waiting to be applied, flushed at most once per frame
+        self.pendingScroll = 0
+        self.scrollPending = False
+
         # Read the files and folders in this folder and create thumbnails from them
         self._GetThumbnails()
 
@@ -80,11 +111,9 @@ class FileBrowser():
         # Reset the scrolling
         self.currentScroll = 0
 
-        # Clear the thumbnails down if they exist
-        if self.thumbnailDict:
-            for thumbnail in self.thumbnailDict.values():
-                thumbnail.delete()
-            self.thumbnailDict.clear()
+        # Clear the thumbnail mappings, the containers themselves are pooled and reused below
+        self.thumbnailDict.clear()
+        self.thumbnailList.clear()
 
         # Work out the full thumbnail size (this is the size reserved for image and name)
         thumbnailSize = self.mainWindow.width // self.thumbnailsPerRow
@@ -92,23 +121,26 @@ class FileBrowser():
         # Tell the sprite how big the container is
         Container.setContainerSize(thumbnailSize)
 
-        # Iterate through the files in the folder
-        for path in self.inputPath.iterdir():
-            # Ignore files starting with a . as they are hidden
-            if not path.name.startswith('.'):
-                if path.is_dir():
-                    # If this is a folder append it to the folder list
-                    folderList.append(path)
-                elif path.suffix.lower() in supportedExtensions.values():
-                    # If this is a file, append it to the file list
-                    fileList.append(path)
-
-        # Sort the folder list and insert the parent of this folder at the start
-        folderList = list(sorted(folderList, key=lambda path: path.name.lower()))
+        # Iterate through the entries in the folder, scandir reuses the file type cached
+        # from the directory read rather than issuing a stat call per path
+        with os.scandir(self.inputPath) as entries:
+            for entry in entries:
+                # Ignore files starting with a . as they are hidden
+                if not entry.name.startswith('.'):
+                    if entry.is_dir(follow_symlinks=False):
+                        # If this is a folder append it to the folder list
+                        folderList.append(Path(entry.path))
+                    elif '.' in entry.name and entry.name.rpartition('.')[2].lower() in _SUPPORTED_EXT:
+                        # If this is a file, append it to the file list
+                        fileList.append(Path(entry.path))
+
+        # Sort the folder list in place, lowercasing each name once rather than per comparison,
+        # and insert the parent of this folder at the start
+        folderList.sort(key=lambda path: path.name.lower())
         folderList.insert(0, self.inputPath.parent)
 
-        # Sort the file list
-        fileList = list(sorted(fileList, key=lambda path: path.name.lower()))
+        # Sort the file list in place
+        fileList.sort(key=lambda path: path.name.lower())
 
         # The full list is now folders followed by files
         fullPathList = folderList + fileList
@@ -119,50 +151,76 @@ class FileBrowser():
             xStart = thumbnailSize * (count % self.thumbnailsPerRow)
             yStart = self.mainWindow.height - (thumbnailSize * ((count // self.thumbnailsPerRow) + 1))
 
-            # Create a sprite from the image and add it to the drawing batch
-            container = Container(xStart, yStart, self.mainWindow.height, self.batch, self.toTS, self.queueLock)
+            if count < len(self.containerPool):
+                # Reuse a pooled container, resetting it for the new position and path
+                container = self.containerPool[count]
+                container.Reset(xStart, yStart)
+            else:
+                # The pool has run short, create a new container and keep it for future folders
+                container = Container(xStart, yStart, self.mainWindow.height, self.batch, self.toTS, self.queueLock, self.spriteGroup, self.overlayGroup, self.thumbnailCache)
+                self.containerPool.append(container)
 
             # Add the path of the image or folder, this property will call _updateSprite triggering the thumbnail server to fetch the image
             container.path = path
 
             # Schedule a check for images from the thumbnail server
-            pyglet.clock.schedule_once(self.ReceiveImages, 1 / 60)
+            self._ScheduleReceive()
 
-            # Add the sprite to the dictionary
+            # Add the sprite to the dictionary and the display ordered list
             self.thumbnailDict[path] = container
+            self.thumbnailList.append(container)
 
             # Work out how much we are allowed to scroll this view vertically
             self.scrollableAmount = abs(container.y) if container.y < 0 else 0
 
+        # Clear down any pooled containers beyond the entries in this folder
+        for container in self.containerPool[len(fullPathList):]:
+            container.delete()
+
         # Highlight the first thumbnail
-        list(self.thumbnailDict.values())[self.highlightedImageIndex].highlighted = True
+        self.thumbnailList[self.highlightedImageIndex].highlighted = True
+
+    def _ScheduleReceive(self) -> None:
+        # Schedule a check for images from the thumbnail server unless one is already pending,
+        # so creating thousands of containers queues a single clock callback rather than one each
+        if not self.receivePending:
+            self.receivePending = True
+            pyglet.clock.schedule_once(self.ReceiveImages, 1 / 60)
 
     def ReceiveImages(self, dt) -> None:
-        # Assume that the queue is not empty
-        queueEmpty = False
-
-        # Receive all the images we can from the thumbnail server if any are available
-        while not queueEmpty:
-            # Receive the image, getting a lock to ensure this end of the pipe is accessed by only one thread
-            with self.queueLock:
-                try:
-                    path, fullImage = self.fromTS.get_nowait()
-                except queue.Empty:
-                    # Show that the queue is now empty
-                    queueEmpty = True
-
-                    # Initialise path and fullImage to None
-                    path: Optional[str] = None
-                    fullImage: Optional[ImageData] = None
-
-            # If the path is in the dictionary, call the container's ReceiveImage function
-            if path is not None and fullImage is not None and path in self.thumbnailDict:
-                self.thumbnailDict[path].ReceiveImage(fullImage)
+        # Allow the next check to be scheduled
+        self.receivePending = False
+
+        # The thumbnail server sends results in bursts, so splice the queue's entire deque
+        # out under one mutex acquisition rather than paying a lock round trip per item
+        fromTS = self.fromTS
+        with fromTS.mutex:
+            items = list(fromTS.queue)
+            fromTS.queue.clear()
+            fromTS.unfinished_tasks -= len(items)
+            fromTS.not_full.notify_all()
+
+        if items:
+            # New thumbnails arrived off the event path, redraw on the next frame
+            self.mainWindow.requestRedraw()
+
+        # For each image whose path is in the dictionary, call the container's ReceiveImage function
+        for path, fullImage in items:
+            if fullImage is not None:
+                # Cache the decoded thumbnail, evicting the oldest entry once the cache is full
+                self.thumbnailCache[path] = fullImage
+                self.thumbnailCache.move_to_end(path)
+
+                if len(self.thumbnailCache) > self.maxCachedThumbnails:
+                    self.thumbnailCache.popitem(last=False)
+
+                if path in self.thumbnailDict:
+                    self.thumbnailDict[path].ReceiveImage(fullImage)
 
         # Check if any containers are waiting for images
-        if any([container.imageLoading for container in self.thumbnailDict.values()]):
+        if any(container.imageLoading for container in self.thumbnailList):
             # Schedule a check for images from the thumbnail server
-            pyglet.clock.schedule_once(self.ReceiveImages, 1 / 60)
+            self._ScheduleReceive()
 
     def on_key_press(self, symbol, modifiers):
         if symbol == key.UP:
@@ -174,7 +232,7 @@ class FileBrowser():
                 self._GetThumbnails()
             else:
                 # Reset the highlight on the current thumbnail
-                list(self.thumbnailDict.values())[self.highlightedImageIndex].highlighted = False
+                self.thumbnailList[self.highlightedImageIndex].highlighted = False
 
                 # Increment the highlighted index
                 self.highlightedImageIndex -= self.thumbnailsPerRow
@@ -184,7 +242,7 @@ class FileBrowser():
                     self.highlightedImageIndex = 0
 
                 # Get the new thumbnail
-                newThumbnail = list(self.thumbnailDict.values())[self.highlightedImageIndex]
+                newThumbnail = self.thumbnailList[self.highlightedImageIndex]
 
                 # Highlight the image at the new index
                 newThumbnail.highlighted = True
@@ -193,17 +251,17 @@ class FileBrowser():
                 self.CheckThumbnailVisible(newThumbnail)
         elif symbol == key.DOWN:
             # Reset the highlight on the current thumbnail
-            list(self.thumbnailDict.values())[self.highlightedImageIndex].highlighted = False
+            self.thumbnailList[self.highlightedImageIndex].highlighted = False
 
             # Increment the highlighted index
             self.highlightedImageIndex += self.thumbnailsPerRow
 
             # Check the index is in bounds
-            if self.highlightedImageIndex >= len(self.thumbnailDict):
-                self.highlightedImageIndex = len(self.thumbnailDict) - 1
+            if self.highlightedImageIndex >= len(self.thumbnailList):
+                self.highlightedImageIndex = len(self.thumbnailList) - 1
 
             # Get the new thumbnail
-            newThumbnail = list(self.thumbnailDict.values())[self.highlightedImageIndex]
+            newThumbnail = self.thumbnailList[self.highlightedImageIndex]
 
             # Highlight the image at the new index
             newThumbnail.highlighted = True
@@ -212,17 +270,17 @@ class FileBrowser():
             self.CheckThumbnailVisible(newThumbnail)
         elif symbol == key.RIGHT:
             # Reset the highlight on the current thumbnail
-            list(self.thumbnailDict.values())[self.highlightedImageIndex].highlighted = False
+            self.thumbnailList[self.highlightedImageIndex].highlighted = False
 
             # Increment the highlighted index
             self.highlightedImageIndex += 1
 
             # Check the index is in bounds
-            if self.highlightedImageIndex >= len(self.thumbnailDict):
+            if self.highlightedImageIndex >= len(self.thumbnailList):
                 self.highlightedImageIndex = 0
 
             # Get the new thumbnail
-            newThumbnail = list(self.thumbnailDict.values())[self.highlightedImageIndex]
+            newThumbnail = self.thumbnailList[self.highlightedImageIndex]
 
             # Highlight the image at the new index
             newThumbnail.highlighted = True
@@ -231,17 +289,17 @@ class FileBrowser():
             self.CheckThumbnailVisible(newThumbnail)
         elif symbol == key.LEFT:
             # Reset the highlight on the current thumbnail
-            list(self.thumbnailDict.values())[self.highlightedImageIndex].highlighted = False
+            self.thumbnailList[self.highlightedImageIndex].highlighted = False
 
             # Decrement the highlighted index
             self.highlightedImageIndex -= 1
 
             # Check the index is in bounds
             if self.highlightedImageIndex < 0:
-                self.highlightedImageIndex = len(self.thumbnailDict) - 1
+                self.highlightedImageIndex = len(self.thumbnailList) - 1
 
             # Get the new thumbnail
-            newThumbnail = list(self.thumbnailDict.values())[self.highlightedImageIndex]
+            newThumbnail = self.thumbnailList[self.highlightedImageIndex]
 
             # Highlight the image at the new index
             newThumbnail.highlighted = True
@@ -250,9 +308,9 @@ class FileBrowser():
             self.CheckThumbnailVisible(newThumbnail)
         elif symbol == key.ENTER:
             # Load the currently highlighted image or folder
-            self.LoadImage(list(self.thumbnailDict.values())[self.highlightedImageIndex].path)
+            self.LoadImage(self.thumbnailList[self.highlightedImageIndex].path)
         elif symbol == key.G:
-            for thumbnail in self.thumbnailDict.values():
+            for thumbnail in self.thumbnailList:
                 # Toggle display of gridlines
                 thumbnail.drawGridLines = not thumbnail.drawGridLines
 
@@ -277,17 +335,31 @@ class FileBrowser():
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
         # Check that there has been enough of a scroll to be worth registering
-        if scroll_y < -0.2:
-            scroll = scroll_y * 10
-        elif scroll_y > 0.2:
-            scroll = scroll_y * 10
-        else:
-            scroll = None
+        if scroll_y < -0.2 or scroll_y > 0.2:
+            # Accumulate the scroll rather than applying it immediately, a fast trackpad
+            # fires many events per frame and each apply is a pass over every container
+            self.pendingScroll += scroll_y * 10
+
+            # Flush the accumulated scroll at most once per frame
+            if not self.scrollPending:
+                self.scrollPending = True
+                pyglet.clock.schedule_once(self._FlushScroll, 1 / 60)
+
+    def _FlushScroll(self, dt) -> None:
+        # Allow the next flush to be scheduled
+        self.scrollPending = False
+
+        # Take the accumulated scroll and reset the accumulator
+        scroll = self.pendingScroll
+        self.pendingScroll = 0
 
         if scroll:
-            # Scroll by the scroll amount
+            # Scroll by the accumulated amount in a single pass
             self.ScrollBrowser(scroll)
 
+            # The containers moved off the event path, redraw on the next frame
+            self.mainWindow.requestRedraw()
+
     def ScrollBrowser(self, scroll) -> None:
         # Work out what the new scroll value would be
         newScroll = self.currentScroll + scroll
@@ -303,24 +375,45 @@ class FileBrowser():
             self.currentScroll = self.scrollableAmount
 
         # Update all the thumbnails, this will trigger new images to be loaded bythe thumbnail server if necessary
-        for thumbail in self.thumbnailDict.values():
-            thumbail.y += scroll
+        for thumbail in self.thumbnailList:
+            thumbail.scrollBy(scroll)
 
         # Schedule a check for images from the thumbnail server
-        pyglet.clock.schedule_once(self.ReceiveImages, 1 / 60)
+        self._ScheduleReceive()
+
+    def _HitTest(self, x: int, y: int) -> Optional[Container]:
+        # The thumbnails are on a fixed grid, so the container under the point can be computed
+        # directly from the pixel coordinates rather than scanning every container
+        thumbnailSize = self.mainWindow.width // self.thumbnailsPerRow
+
+        # Work out the column and row of the point, accounting for the current scroll,
+        # which is a float once trackpad scrolls have accumulated so the row needs
+        # truncating back to an index
+        column = x // thumbnailSize
+        row = int((self.mainWindow.height + self.currentScroll - y - 1) // thumbnailSize)
+
+        # Convert the row and column into a container index
+        index = (row * self.thumbnailsPerRow) + column
+
+        # Check the index is in bounds, points in the margin around the image fail InSprite
+        if 0 <= index < len(self.thumbnailList) and column < self.thumbnailsPerRow:
+            container = self.thumbnailList[index]
+
+            # Check whether the point actually falls within the container's sprite
+            if container.InSprite(x, y):
+                return container
+
+        # The point did not hit a thumbnail
+        return None
 
     def on_mouse_press(self, x, y, button, modifiers):
         if button == mouse.LEFT:
-            # Iterate through the sprites
-            for sprite in self.thumbnailDict.values():
-                # Get each sprite to check whether it was the target of the mouse click
-                if sprite.InSprite(x, y):
-                    if sprite.path:
-                        # Load the new image
-                        self.LoadImage(sprite.path)
-
-                        # Exit the loop
-                        break
+            # Work out which container, if any, was the target of the mouse click
+            container = self._HitTest(x, y)
+
+            if container is not None and container.path:
+                # Load the new image
+                self.LoadImage(container.path)
         elif button == mouse.RIGHT:
             # Log that the browser window is closing
             self.logQueue.put_nowait(('Closing File Browser', logging.DEBUG))
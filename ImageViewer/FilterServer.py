@@ -0,0 +1,62 @@
+import logging
+import threading
+import queue
+import concurrent.futures
+from typing import Callable
+
+from pyglet.image import ImageData
+
+class FilterServer(threading.Thread):
+    def __init__(self, logQueue: queue.Queue) -> None:
+        super(FilterServer, self).__init__()
+
+        # Set the log queue
+        self.logQueue = logQueue
+
+        # Create a queue to send work to the Filter Server
+        self.toFS = queue.Queue()
+
+        # Create a queue to send results from the Filter Server
+        self.fromFS = queue.Queue()
+
+    def run(self) -> None:
+        # Start a thread pool to apply the filters, Pillow releases the GIL for the heavy
+        # work so concurrent filter requests can overlap across cores
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            # Log that the server has started
+            self.log('Starting Filter Server', logging.DEBUG)
+
+            # Run until told to stop
+            while True:
+                # Receive the image, the filter function to apply, its arguments and the
+                # token identifying which image the request was made against
+                image, filterFunction, args, token = self.toFS.get()
+
+                if image is not None and filterFunction is not None:
+                    # Add a job to the pool to apply the filter and send the result back
+                    pool.submit(self.ApplyFilter, image, filterFunction, args, token)
+                else:
+                    # If the application is closing, exit the loop
+                    break
+
+    def log(self, message: str, level: int) -> None:
+        # Send the message and level to the log queue
+        self.logQueue.put_nowait((message, level))
+
+    def ApplyFilter(self, image: ImageData, filterFunction: Callable, args: tuple, token: int) -> None:
+        # Try to apply the filter to the image
+        try:
+            filteredImage = filterFunction(image, *args)
+        except:
+            # If the filter cannot be applied, log the error
+            self.log(f'{filterFunction.__name__} Filter Failed', logging.WARN)
+
+            # Set the image to None, this needs to be handled by the receiving end
+            filteredImage = None
+        else:
+            # Log that the filter was applied
+            self.log(f'{filterFunction.__name__} Filter Applied', logging.DEBUG)
+
+        # Send the filtered image back to the viewer along with the request token so
+        # results for an image that is no longer displayed can be discarded
+        self.fromFS.put_nowait((filteredImage, token))
@@ -4,9 +4,27 @@ from PIL.ImageFilter import Filter
 
 from pyglet.image import ImageData
 
+# The ImageFilter entries are classes that Pillow instantiates on every filter() call,
+# so build each filter once at import time and share the instance across calls
+_SHARPEN = ImageFilter.SHARPEN()
+_BLUR = ImageFilter.BLUR()
+_CONTOUR = ImageFilter.CONTOUR()
+_DETAIL = ImageFilter.DETAIL()
+_EDGE_ENHANCE = ImageFilter.EDGE_ENHANCE()
+_EMBOSS = ImageFilter.EMBOSS()
+_FIND_EDGES = ImageFilter.FIND_EDGES()
+_SMOOTH = ImageFilter.SMOOTH()
+_UNSHARP_MASK = ImageFilter.UnsharpMask()
+
 def PygletToPillow(inputImage: ImageData) -> Image.Image:
-    # Convert the pyglet ImageData to a Pillow Image
-    return Image.frombytes('RGBA', (inputImage.width, inputImage.height), inputImage.get_data())
+    # Get the width once, it is needed for both the pitch and the size
+    width = inputImage.width
+
+    # Wrap the pixel data with frombuffer and the raw decoder, which shares the buffer with
+    # the new image rather than copying it a second time as frombytes would, asking for a
+    # negative pitch so the rows arrive top to bottom as Pillow expects and the conversion
+    # back with -width * 4 restores the original orientation
+    return Image.frombuffer('RGBA', (width, inputImage.height), inputImage.get_data('RGBA', -width * 4), 'raw', 'RGBA', 0, 1)
 
 def PillowToPyglet(inputImage: Image.Image) -> ImageData:
     # Get the mode (e.g., 'RGBA')
@@ -21,6 +39,14 @@ def PillowToPyglet(inputImage: Image.Image) -> ImageData:
     # Create a Pyglet ImageData object from the bytes and return it
     return ImageData(inputImage.width, inputImage.height, mode, rawImage, -inputImage.width * formatLength)
 
+def _RgbaToPyglet(inputImage: Image.Image) -> ImageData:
+    # The filter and enhancement paths always work on RGBA images, so the mode and the
+    # bytes per pixel are known here without inspecting the image
+    width = inputImage.width
+
+    # Create a Pyglet ImageData object from the bytes and return it
+    return ImageData(width, inputImage.height, 'RGBA', inputImage.tobytes(), -width * 4)
+
 def _ManipulateImage(inputImage: ImageData, filter: Filter | Callable[[], Filter]) -> ImageData:
     # Convert the pyglet ImageData to a Pillow Image
     pilImage = PygletToPillow(inputImage)
@@ -29,43 +55,43 @@ def _ManipulateImage(inputImage: ImageData, filter: Filter | Callable[[], Filter
     manipulatedPilImage = pilImage.filter(filter)
 
     # Return the image as a Pyglet ImageData type
-    return PillowToPyglet(manipulatedPilImage)
+    return _RgbaToPyglet(manipulatedPilImage)
 
 def Sharpen(inputImage: ImageData) -> ImageData:
     # Sharpen the image
-    return _ManipulateImage(inputImage, ImageFilter.SHARPEN)
+    return _ManipulateImage(inputImage, _SHARPEN)
 
 def Blur(inputImage: ImageData) -> ImageData:
     # Blur the image
-    return _ManipulateImage(inputImage, ImageFilter.BLUR)
+    return _ManipulateImage(inputImage, _BLUR)
 
 def Contour(inputImage: ImageData) -> ImageData:
     # Contour the image
-    return _ManipulateImage(inputImage, ImageFilter.CONTOUR)
+    return _ManipulateImage(inputImage, _CONTOUR)
 
 def Detail(inputImage: ImageData) -> ImageData:
     # Detail the image
-    return _ManipulateImage(inputImage, ImageFilter.DETAIL)
+    return _ManipulateImage(inputImage, _DETAIL)
 
 def EdgeEnhance(inputImage: ImageData) -> ImageData:
     # Edge enhance the image
-    return _ManipulateImage(inputImage, ImageFilter.EDGE_ENHANCE)
+    return _ManipulateImage(inputImage, _EDGE_ENHANCE)
 
 def Emboss(inputImage: ImageData) -> ImageData:
     # Emboss the image
-    return _ManipulateImage(inputImage, ImageFilter.EMBOSS)
+    return _ManipulateImage(inputImage, _EMBOSS)
 
 def FindEdges(inputImage: ImageData) -> ImageData:
     # Find Edges the image
-    return _ManipulateImage(inputImage, ImageFilter.FIND_EDGES)
+    return _ManipulateImage(inputImage, _FIND_EDGES)
 
 def Smooth(inputImage: ImageData) -> ImageData:
     # Smooth the image
-    return _ManipulateImage(inputImage, ImageFilter.SMOOTH)
+    return _ManipulateImage(inputImage, _SMOOTH)
 
 def UnsharpMask(inputImage: ImageData) -> ImageData:
     # Sharpen the image using an unsharp mask
-    return _ManipulateImage(inputImage, ImageFilter.UnsharpMask)
+    return _ManipulateImage(inputImage, _UNSHARP_MASK)
 
 def Colour(inputImage: ImageData, factor: float) -> ImageData:
     # Convert the pyglet ImageData to a Pillow Image
@@ -78,7 +104,7 @@ def Colour(inputImage: ImageData, factor: float) -> ImageData:
     manipulatedPilImage = enhance.enhance(factor)
 
     # Return the image as a Pyglet ImageData type
-    return PillowToPyglet(manipulatedPilImage)
+    return _RgbaToPyglet(manipulatedPilImage)
 
 def Contrast(inputImage: ImageData, factor: float) -> ImageData:
     # Convert the pyglet ImageData to a Pillow Image
@@ -91,7 +117,7 @@ def Contrast(inputImage: ImageData, factor: float) -> ImageData:
     manipulatedPilImage = enhance.enhance(factor)
 
     # Return the image as a Pyglet ImageData type
-    return PillowToPyglet(manipulatedPilImage)
+    return _RgbaToPyglet(manipulatedPilImage)
 
 def Brightness(inputImage: ImageData, factor: float) -> ImageData:
     # Convert the pyglet ImageData to a Pillow Image
@@ -104,4 +130,4 @@ def Brightness(inputImage: ImageData, factor: float) -> ImageData:
     manipulatedPilImage = enhance.enhance(factor)
 
     # Return the image as a Pyglet ImageData type
-    return PillowToPyglet(manipulatedPilImage)
+    return _RgbaToPyglet(manipulatedPilImage)
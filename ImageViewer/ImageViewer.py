@@ -1,7 +1,7 @@
-from bisect import bisect
+import concurrent.futures
+from collections import OrderedDict
 import logging
-from datetime import datetime
-from enum import Enum, auto
+import os
 import math
 from pathlib import Path
 import time
@@ -14,14 +14,68 @@ from pyglet.sprite import Sprite
 from pyglet.image import ImageData, ImageDataRegion
 
 from ImageViewer.FileBrowser import FileBrowser
-from ImageViewer.ImageTools import Brightness, Colour, Blur, Contour, Contrast, Detail, EdgeEnhance, Emboss, FindEdges, Sharpen, Smooth, UnsharpMask
+from ImageViewer.FilterServer import FilterServer
+from PIL import Image
+
+from ImageViewer.ImageTools import Brightness, Colour, Blur, Contour, Contrast, Detail, EdgeEnhance, Emboss, FindEdges, PillowToPyglet, PygletToPillow, Sharpen, Smooth, UnsharpMask
 from ImageViewer.FileTypes import supportedExtensions
 
-class Direction(Enum):
-    Forward = auto()
-    Back = auto()
+# Freeze the supported suffixes once, an in test against dict.values() scans the view
+# linearly for every file in the folder
+_SUPPORTED_SUFFIXES = frozenset(extension.lower().lstrip('.') for extension in supportedExtensions.values())
+
+# How many decoded images to keep for quick return navigation, decoded RGBA frames
+# are large so the cache stays small
+_IMAGE_CACHE_SIZE = 8
+
+# Cached folder listings in least to most recently used order, each entry holds the
+# folder mtime it was scanned at and the sorted listing, so revisiting a folder costs
+# one stat instead of a full rescan
+_LISTING_CACHE: OrderedDict[str, tuple[int, list[Path]]] = OrderedDict()
+_LISTING_CACHE_SIZE = 32
+
+# Scroll directions as signed ints so the off screen start offset is just
+# direction * width, 0 means no scroll is in progress
+FORWARD = 1
+BACK = -1
+
+# Map each Command-modified key to the filter function it queues and the arguments
+# for it, one dict lookup replaces the thirteen branch chain in on_key_press
+_FILTER_TABLE = {
+    key.S: (Sharpen, ()),
+    key.B: (Blur, ()),
+    key.C: (Contour, ()),
+    key.D: (Detail, ()),
+    key.E: (EdgeEnhance, ()),
+    key.M: (Emboss, ()),
+    key.F: (FindEdges, ()),
+    key.O: (Smooth, ()),
+    key.U: (UnsharpMask, ()),
+    key.W: (Colour, (0.0,)),
+    key.RIGHT: (Colour, (1.1,)),
+    key.LEFT: (Colour, (0.9,)),
+}
 
 class ImageViewer():
+    # Declare slots for every attribute the viewer assigns, removing the per instance
+    # dict and making the attribute reads in the per frame handlers direct slot loads
+    __slots__ = (
+        'mainWindow', 'logQueue', 'image', 'originalImage', 'originalXPos', 'originalYPos',
+        'originalScale', 'sprite', 'oldSprite', 'xStartDrag', 'yStartDrag', 'rectangle',
+        'imageCanBeSaved', 'leftControlHeld', 'mouseX', 'mouseY', 'fps',
+        'targetXPos', 'transitionTime', 'direction',
+        'elapsedTransitionTime', 'bezierCurve', 'p0', 'p1', 'p2', 'p3', 'p0p1Line',
+        'p2p3Line', 'p1Circle', 'p2Circle', 'draggingP1Circle', 'draggingP2Circle',
+        '_mouseVisible', '_autoHideScheduled', '_lastMouseMove', 'fileBrowser',
+        'background', 'foreground', 'batch', '_windowWidth', '_windowHeight',
+        '_halfWidth', '_quarterWidth', '_halfHeight', '_quarterHeight', '_invWidth',
+        '_invHeight', '_handCursor', '_crosshairCursor', 'filterServer', '_imageDecoder',
+        '_imageFutures', 'images', 'currentImageIndex', 'maxImageIndex', 'pointList',
+        '_bezierCoeffs', '_bezierVisible', '_pendingZoom', '_pendingFocus',
+        '_zoomScheduled', '_xTrajectory', '_spriteBounds', '_imageCache',
+        '_filterGeneration',
+    )
+
     def __init__(self, mainWindow: Window, logQueue: queue.Queue) -> None:
 
         # Set the main window
@@ -45,20 +99,23 @@ class ImageViewer():
         # Sprite containing the old image when scrolling in the new one
         self.oldSprite: Optional[Sprite] = None
 
+        # Cached sprite edges (left, bottom, right, top) for the motion event clamp
+        self._spriteBounds: tuple[float, float, float, float] = (0, 0, 0, 0)
+
         # Set safe defaults
         self.xStartDrag = 0
         self.yStartDrag = 0
-        self.rectangle: Optional[pyglet.shapes.Rectangle] = None
         self.imageCanBeSaved: bool = False
         self.leftControlHeld = False
         self.mouseX = 0
         self.mouseY = 0
         self.fps = 60
-        self.startXPos = 0
         self.targetXPos = 0
         self.transitionTime = 0.5
-        self.direction: Optional[Direction] = None
-        self.startTransitionTime: Optional[float] = None
+        self.direction = 0
+        self.elapsedTransitionTime = 0.0
+        # Per-frame x positions baked when a transition starts
+        self._xTrajectory: list[float] = []
         self.bezierCurve: Optional[list[pyglet.shapes.Line]] = None
         # Set the P0 - P3 control points
         self.p0: tuple[float, float] = (0.0, 0.0)
@@ -71,6 +128,17 @@ class ImageViewer():
         self.p2Circle: Optional[pyglet.shapes.Circle] = None
         self.draggingP1Circle = False
         self.draggingP2Circle = False
+        # The curve shapes persist once created, this tracks whether they are shown
+        self._bezierVisible = False
+        # Track the mouse visibility and pending hide so motion events only touch the
+        # native cursor and the clock on state transitions
+        self._mouseVisible = True
+        self._autoHideScheduled = False
+        self._lastMouseMove = 0.0
+        # Accumulated zoom waiting to be applied on the next clock tick
+        self._pendingZoom = 1.0
+        self._pendingFocus = (0, 0)
+        self._zoomScheduled = False
         self.fileBrowser: Optional[FileBrowser] = None
         # Setup ordered groups to ensure shapes are drawn on top of the image
         self.background = pyglet.graphics.OrderedGroup(0)
@@ -79,9 +147,54 @@ class ImageViewer():
         # Create a batch drawing context
         self.batch = pyglet.graphics.Batch()
 
+        # Create the persistent selection rectangle hidden at 50% opacity, starting a
+        # selection repositions and shows it rather than constructing a new shape
+        self.rectangle = pyglet.shapes.Rectangle(0, 0, 0, 0, (30, 144, 255), batch=self.batch, group=self.foreground)
+        self.rectangle.opacity = 128
+        self.rectangle.visible = False
+
+        # Cache the window size and the curve space to screen space constants derived
+        # from it, refreshed by on_resize, so the hot paths read plain attributes
+        # instead of going through the window's property machinery
+        self.on_resize(self.mainWindow.width, self.mainWindow.height)
+
+        # Resolve the system cursors once rather than on every click or key press
+        self._handCursor = self.mainWindow.get_system_mouse_cursor(self.mainWindow.CURSOR_HAND)
+        self._crosshairCursor = self.mainWindow.get_system_mouse_cursor(self.mainWindow.CURSOR_CROSSHAIR)
+
+        # Create and start the filter server so image filters run off the UI thread
+        self.filterServer = FilterServer(self.logQueue)
+        self.filterServer.start()
+
+        # Bumped on every image change so in-flight filter results for a previous
+        # image can be recognised and discarded
+        self._filterGeneration = 0
+
+        # Create a small pool to decode the neighbouring images in the background so
+        # navigation does not stall on the decoder
+        self._imageDecoder = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self._imageFutures: dict[Path, concurrent.futures.Future] = {}
+
+        # Recently displayed decodes in least to most recently used order
+        self._imageCache: OrderedDict[Path, ImageData] = OrderedDict()
+
         # Create the initial Bezier curve
         self._CreateBezierCurve()
 
+    def on_resize(self, width: int, height: int) -> None:
+        # Cache the new window size
+        self._windowWidth = width
+        self._windowHeight = height
+
+        # Refresh the curve space to screen space constants, these feed every shape
+        # update while a control point is dragged
+        self._halfWidth = width * 0.5
+        self._quarterWidth = width * 0.25
+        self._halfHeight = height * 0.5
+        self._quarterHeight = height * 0.25
+        self._invWidth = 1.0 / width
+        self._invHeight = 1.0 / height
+
     def SetupImagePathAndLoadImage(self, inputPath: Path) -> None:
         # Check for a file on the command line
         if inputPath.is_file():
@@ -112,78 +225,181 @@ class ImageViewer():
 
     # Function to return a list of Paths pointing at images in the current folder
     def _GetImagePathList(self, imagePath: Path) -> list[Path]:
-        # Return the list of images Paths, sorted alphabetically (case insensitive)
-        return sorted([image for image in imagePath.iterdir() if image.suffix.lower() in supportedExtensions.values()], key=lambda x: x.name.lower())
+        # An unchanged folder mtime means the listing from the last scan still holds
+        cacheKey = os.fspath(imagePath)
+        folderMtime = os.stat(imagePath).st_mtime_ns
+        cached = _LISTING_CACHE.get(cacheKey)
+
+        if cached is not None and cached[0] == folderMtime:
+            # Serve a copy from the cache and mark the folder as most recently used,
+            # the copy keeps later inserts into the image list out of the cache
+            _LISTING_CACHE.move_to_end(cacheKey)
+            return cached[1].copy()
+
+        # Scan the folder with os.scandir, which hands back plain directory entries
+        # without constructing a Path object per file the way iterdir does, testing
+        # the extension with rpartition as splitext is a Python level call per entry,
+        # guarding against extensionless names where rpartition returns the whole name
+        with os.scandir(imagePath) as entries:
+            names = [entry.name for entry in entries if '.' in entry.name and entry.name.rpartition('.')[2].lower() in _SUPPORTED_SUFFIXES and entry.is_file()]
+
+        # Sort the names alphabetically (case insensitive)
+        names.sort(key=str.casefold)
+
+        # Only build Paths once the ordering is settled
+        pathList = [imagePath / name for name in names]
+
+        # Store a copy of the listing, evicting the least recently used folder when
+        # the cache is full
+        _LISTING_CACHE[cacheKey] = (folderMtime, pathList.copy())
+        if len(_LISTING_CACHE) > _LISTING_CACHE_SIZE:
+            _LISTING_CACHE.popitem(last=False)
+
+        return pathList
 
     def _HideMouse(self, dt: float = 0.0) -> None:
-        # Hide the mouse after the timeout expires
-        self.mainWindow.set_mouse_visible(False)
+        # Work out how long the mouse has been idle
+        idleTime = time.time() - self._lastMouseMove
+
+        if dt > 0.0 and idleTime < 0.5:
+            # The mouse has moved since this hide was scheduled, try again when the
+            # remaining timeout expires rather than hiding mid movement
+            pyglet.clock.schedule_once(self._HideMouse, 0.5 - idleTime)
+        else:
+            # Hide the mouse after the timeout expires
+            self.mainWindow.set_mouse_visible(False)
+            self._mouseVisible = False
+            self._autoHideScheduled = False
 
     def _ShowMouse(self, autoHide: bool) -> None:
-        # Unschedule the mouse hide callback
-        pyglet.clock.unschedule(self._HideMouse)
+        # Record the activity so a pending hide callback knows the mouse moved
+        self._lastMouseMove = time.time()
 
-        # Set the mouse to be visible
-        self.mainWindow.set_mouse_visible(True)
+        if not self._mouseVisible:
+            # Only make the native visibility call on the hidden to visible transition
+            self.mainWindow.set_mouse_visible(True)
+            self._mouseVisible = True
 
-        # If we want to hide the mouse again after a timeout, schedule the callback
         if autoHide:
-            pyglet.clock.schedule_once(self._HideMouse, 0.5)
+            if not self._autoHideScheduled:
+                # Schedule the hide once, it reschedules itself while the mouse keeps
+                # moving so motion events no longer touch the clock at all
+                pyglet.clock.schedule_once(self._HideMouse, 0.5)
+                self._autoHideScheduled = True
+        elif self._autoHideScheduled:
+            # Cancel a pending hide, the mouse should stay visible
+            pyglet.clock.unschedule(self._HideMouse)
+            self._autoHideScheduled = False
 
     def _LoadImage(self, imageRegion: Optional[ImageDataRegion] = None) -> None:
+        # The displayed image is changing, so filter results for the old one are stale
+        self._filterGeneration += 1
+
         if self.sprite:
-            if self.direction is None:
+            if not self.direction:
                 # Remove the existing sprite if it exists
                 self.sprite.delete()
                 self.sprite = None
+                self._UpdateSpriteBounds()
             else:
                 # Store the old sprite away
                 self.oldSprite = self.sprite
 
         # Remove the existing rectangle if it exists
-        if self.rectangle:
-            self.rectangle.delete()
-            self.rectangle = None
+        self._ClearRectangle()
 
         if imageRegion:
             self.image = imageRegion
             self.imageCanBeSaved = True
             loadingImage = False
         else:
-            # Load the new image
-            self.image = pyglet.image.load(self.images[self.currentImageIndex])
+            # Check for a recently displayed decode of this image first
+            imagePath = self.images[self.currentImageIndex]
+            cachedImage = self._imageCache.get(imagePath)
+
+            if cachedImage is not None:
+                # Reuse the cached decode and mark it as the most recently used
+                self.image = cachedImage
+                self._imageCache.move_to_end(imagePath)
+            else:
+                # Use the predecoded image if the background decoder has it, otherwise load it here
+                future = self._imageFutures.pop(imagePath, None)
+                self.image = future.result() if future is not None else self._DecodeImage(imagePath)
+
+                # Remember the decode so stepping back to this image skips the decoder,
+                # evicting the least recently used entry once the cache is full
+                self._imageCache[imagePath] = self.image
+                if len(self._imageCache) > _IMAGE_CACHE_SIZE:
+                    self._imageCache.popitem(last=False)
+
             self.originalImage = self.image
             self.imageCanBeSaved = False
             loadingImage = True
 
+            # Start decoding the neighbouring images ready for the next navigation
+            self._PrefetchImages()
+
         # Scale and position the image to fit the window
         self._ScaleImage(loadingImage)
 
+    def _DecodeImage(self, imagePath: Path) -> ImageData:
+        # Decode the image from disk
+        image = pyglet.image.load(imagePath)
+
+        # Cap the decoded size at twice the window in each axis, the texture upload and
+        # every filter pay for each pixel and detail beyond this cap is invisible
+        # without extreme zoom
+        maxWidth = self._windowWidth * 2
+        maxHeight = self._windowHeight * 2
+
+        if image.width > maxWidth or image.height > maxHeight:
+            # Work out the shrink factor that fits the cap keeping the aspect ratio
+            shrinkFactor = min(maxWidth / image.width, maxHeight / image.height)
+
+            # Resample through Pillow, Lanczos keeps the downscale sharp
+            pilImage = PygletToPillow(image)
+            pilImage = pilImage.resize((int(image.width * shrinkFactor), int(image.height * shrinkFactor)), Image.LANCZOS)
+            image = PillowToPyglet(pilImage)
+
+        return image
+
+    def _PrefetchImages(self) -> None:
+        # Work out the previous and next image paths, wrapping at the ends of the list
+        neighbourPaths = {
+            self.images[(self.currentImageIndex + 1) % len(self.images)],
+            self.images[(self.currentImageIndex - 1) % len(self.images)],
+        }
+
+        # Drop any cached decodes that are no longer neighbours of the current image
+        for path in list(self._imageFutures):
+            if path not in neighbourPaths:
+                del self._imageFutures[path]
+
+        # Start decoding any neighbour that is not already cached, decoded or in flight
+        for path in neighbourPaths:
+            if path not in self._imageFutures and path not in self._imageCache:
+                self._imageFutures[path] = self._imageDecoder.submit(self._DecodeImage, path)
+
     def _ScaleImage(self, loadingImage: bool) -> None:
         if self.image:
             # Work out how much to scale each axis to fit into the screen
-            xScale = self.mainWindow.width / self.image.width
-            yScale = self.mainWindow.height / self.image.height
+            xScale = self._windowWidth / self.image.width
+            yScale = self._windowHeight / self.image.height
 
             # Both axes need to be scaled by the smallest number
             scalingFactor = min(xScale, yScale)
 
             # Calculate the x and y position needed to draw the image in the centre of the screen
-            xPos = self.mainWindow.width / 2 - (scalingFactor * self.image.width / 2)
-            yPos = self.mainWindow.height / 2 - (scalingFactor * self.image.height / 2)
+            xPos = self._halfWidth - (scalingFactor * self.image.width / 2)
+            yPos = self._halfHeight - (scalingFactor * self.image.height / 2)
 
             # Work out where in x we want the new image to stop scrolling in
             self.targetXPos = xPos
 
-            if self.direction == Direction.Forward:
-                # Work out the off screen x position for the new image to start
-                xPos = xPos + self.mainWindow.width
-            elif self.direction == Direction.Back:
-                # Work out the off screen x position for the new image to start
-                xPos = xPos - self.mainWindow.width
-
-            # Store the starting position for use in calculating the transition
-            self.startXPos = xPos
+            # Work out the off screen x position for the new image to start, the
+            # signed direction places it one screen width to either side, or leaves it
+            # unchanged when no scroll is in progress
+            xPos = xPos + (self.direction * self._windowWidth)
 
             # Create a sprite containing the image at the calculated x, y position
             self.sprite = pyglet.sprite.Sprite(img=self.image, x=xPos, y=yPos, batch=self.batch, group=self.background)
@@ -191,6 +407,9 @@ class ImageViewer():
             # Scale the sprite
             self.sprite.scale = scalingFactor
 
+            # Refresh the cached sprite edges for the motion event clamp
+            self._UpdateSpriteBounds()
+
             if loadingImage:
                 # Save the original position
                 self.originalXPos = self.targetXPos
@@ -202,116 +421,145 @@ class ImageViewer():
             # Hide the mouse immediately
             self._HideMouse()
 
-            if self.direction is not None:
-                # Schedule an animation frame at the desired frame rate
-                pyglet.clock.schedule_interval(self._AnimateNewImage, 1 / self.fps)
+            if self.direction:
+                # Bake the eased x position for each expected frame of the transition up
+                # front, so the per-frame callback is an index into this list rather than
+                # a Newton-Raphson solve
+                frameCount = len(self.pointList) - 1
+                xRange = self.targetXPos - xPos
+                self._xTrajectory = [xPos + (xRange * self._GetBezierMovementRatio(frame / frameCount)) for frame in range(frameCount + 1)]
 
-    def _CalculateBezierPoint(self, t: float) -> tuple[float, float]:
-        # Initialise the returned point to 0, 0
-        point: list[float] = [0, 0]
+                # Schedule an animation callback every frame, tying the sprite updates to
+                # the actual draw rate rather than a fixed interval
+                pyglet.clock.schedule(self._AnimateNewImage)
 
-        # Calculate x and y
-        for i in range(2):
-            point[i] = ((1 - t)**3 * self.p0[i]) + (3 * (1 - t)**2 * t * self.p1[i]) + (3 * (1 - t) * t**2 * self.p2[i]) + (t**3 * self.p3[i])
+    def _CalculateBezierPoint(self, t: float) -> tuple[float, float]:
+        # Unpack the polynomial coefficients cached by _CreateBezierCurve
+        ax, bx, cx, ay, by, cy = self._bezierCoeffs
 
-        # Return the calculated point
-        return tuple(point)
+        # Evaluate both axes in Horner form, three multiplies and two adds per axis
+        return ((((ax * t) + bx) * t + cx) * t, (((ay * t) + by) * t + cy) * t)
 
     def _CreateBezierCurve(self):
+        # Factor the cubic into polynomial coefficients for the easing solver, with P0 at
+        # (0, 0) and P3 at (1, 1) these follow directly from P1 and P2
+        cx = 3 * self.p1[0]
+        bx = (3 * self.p2[0]) - (6 * self.p1[0])
+        ax = 1 - cx - bx
+        cy = 3 * self.p1[1]
+        by = (3 * self.p2[1]) - (6 * self.p1[1])
+        ay = 1 - cy - by
+        self._bezierCoeffs = (ax, bx, cx, ay, by, cy)
+
         # Create a list of points on a Bezier curve, first ensure the number of points on the curve is adequate
         framesInTransition = math.ceil(self.fps * self.transitionTime)
 
-        # Calculate the points given the ideal frame numbers, storing them in point list as a lookup table
+        # Calculate the points given the ideal frame numbers, the list is only needed to draw
+        # the curve on screen, the animation evaluates the cubic directly
         self.pointList = [self._CalculateBezierPoint(t / framesInTransition) for t in range(framesInTransition + 1)]
 
-        # Get the x and y points into individual lists to use later with bisect
-        self.xPoints = [x for x, y in self.pointList]
-        self.yPoints = [y for x, y in self.pointList]
-
     def _GetBezierMovementRatio(self, t: float) -> float:
-        # Get the index of t within the x points
-        index = bisect(self.xPoints, t)
-
-        if index <= 0:
-            # Return the first point if the index is 0 or less
-            return self.yPoints[0]
-        elif index >= len(self.yPoints):
-            # Return the last point of the index is the length of the list or greater
-            return self.yPoints[-1]
-
-        # Work out how far between the nearest two points t is
-        xFraction = (t - self.xPoints[index-1]) / (self.xPoints[index] - self.xPoints[index - 1])
-
-        # Use this to interpolate between the two y points related to this value of t
-        y = self.yPoints[index-1] + ((self.yPoints[index] - self.yPoints[index-1]) * xFraction)
+        # Clamp the time parameter to the transition range
+        if t <= 0.0:
+            return 0.0
+        elif t >= 1.0:
+            return 1.0
 
-        # Return the interpolated y point associated with this t
-        return y
+        # Unpack the cached polynomial coefficients
+        ax, bx, cx, ay, by, cy = self._bezierCoeffs
 
-    def _AnimateNewImage(self, dt) -> None:
-        if self.sprite and self.oldSprite:
-            # Set the start transition time if it has not yet been started
-            if self.startTransitionTime is None:
-                self.startTransitionTime = time.time()
-
-            # Get the time now
-            timeNow = time.time()
-
-            # Calculate the amount of time through the transition we are (complete = 1)
-            timeFactor = (timeNow - self.startTransitionTime) / self.transitionTime
+        # Solve x(u) = t with a few Newton-Raphson iterations, the curve maps time along
+        # x to movement along y so the parameter for this time has to be found first
+        u = t
+        for _ in range(4):
+            # Evaluate the derivative of x at the current estimate in Horner form
+            derivative = ((3 * ax * u) + (2 * bx)) * u + cx
 
-            # Use the Bezier lookup table to get the movement factor (y) from the time factor (x)
-            transitionFactor = self._GetBezierMovementRatio(timeFactor)
+            if abs(derivative) < 1e-6:
+                # The slope is too flat for Newton-Raphson to make progress
+                break
 
-            # Use this factor to calculate the new x position
-            newXPos = self.startXPos + ((self.targetXPos - self.startXPos) * transitionFactor)
+            # Step the estimate towards the root
+            u -= ((((ax * u) + bx) * u + cx) * u - t) / derivative
 
-            # Move the two sprites to the new x positions
-            self.oldSprite.x += newXPos - self.sprite.x
-            self.sprite.x = newXPos
+        # Return the movement ratio, y evaluated at the solved parameter
+        return (((ay * u) + by) * u + cy) * u
 
-            # Check whether the scrolling time has elapsed
-            if timeFactor > 1:
+    def _AnimateNewImage(self, dt) -> None:
+        # Hoist the sprites into locals, this callback runs once per frame
+        sprite = self.sprite
+        oldSprite = self.oldSprite
+
+        if sprite and oldSprite:
+            # The sprites are about to move, redraw on the next frame
+            self.mainWindow.requestRedraw()
+
+            # Accumulate the frame time the clock already measured rather than reading
+            # the system clock twice per frame
+            self.elapsedTransitionTime += dt
+
+            # Turn the elapsed time into an index into the prebaked trajectory, clamped
+            # to its last entry, all the easing maths was done at transition start
+            trajectory = self._xTrajectory
+            lastFrame = len(trajectory) - 1
+            frameIndex = min(int(self.elapsedTransitionTime * self.fps), lastFrame)
+
+            # Look up the new x position for this frame
+            targetXPos = self.targetXPos
+            newXPos = trajectory[frameIndex]
+
+            # Move the two sprites to the new x positions through update, which pyglet
+            # documents as the fast path compared with the attribute setters
+            oldSprite.update(x=oldSprite.x + (newXPos - sprite.x))
+            sprite.update(x=newXPos)
+
+            # Check whether the trajectory has been played out or the sprite is within
+            # half a pixel of its target, the tail of the easing only moves sub-pixel
+            # amounts
+            if frameIndex >= lastFrame or abs(newXPos - targetXPos) < 0.5:
                 # Set the sprite x to the target position in case there are rounding errors
-                self.sprite.x = self.targetXPos
+                sprite.update(x=targetXPos)
+
+                # The sprite has settled, refresh the cached edges once rather than on
+                # every frame of the transition
+                self._UpdateSpriteBounds()
 
                 # Unschedule the animation
                 pyglet.clock.unschedule(self._AnimateNewImage)
 
                 # Delete the old sprite
-                self.oldSprite.delete()
+                oldSprite.delete()
                 self.oldSprite = None
 
-                # Reset the scroll direction to None
-                self.direction = None
+                # Reset the scroll direction to idle
+                self.direction = 0
 
-                # Reset the start transition time to None
-                self.startTransitionTime = None
+                # Reset the elapsed transition time for the next transition
+                self.elapsedTransitionTime = 0.0
 
-    def _ConstrainToSprite(self, x: int, y: int) -> tuple[int, int]:
-        # Initialise x and y to 0
-        xPos = 0
-        yPos = 0
+    def _UpdateSpriteBounds(self) -> None:
+        sprite = self.sprite
 
-        if self.sprite:
-            # Constrain x to the sprite dimensions
-            if x < self.sprite.x:
-                xPos = self.sprite.x
-            elif x >= self.sprite.x + self.sprite.width:
-                xPos = self.sprite.x + self.sprite.width
-            else:
-                xPos = x
+        if sprite:
+            # Cache the sprite edges whenever it moves or rescales so the motion event
+            # clamp reads one tuple instead of going through the sprite property
+            # machinery eight times per event
+            x = sprite.x
+            y = sprite.y
+            self._spriteBounds = (x, y, x + sprite.width, y + sprite.height)
+        else:
+            # Without a sprite clamp everything to the origin
+            self._spriteBounds = (0, 0, 0, 0)
 
-            # Constrain y to the sprite dimensions
-            if y < self.sprite.y:
-                yPos = self.sprite.y
-            elif y >= self.sprite.y + self.sprite.height:
-                yPos = self.sprite.y + self.sprite.height
-            else:
-                yPos = y
+    def _ConstrainToSprite(self, x: int, y: int) -> tuple[int, int]:
+        # Clamp x and y to the cached sprite edges with min/max rather than branching
+        left, bottom, right, top = self._spriteBounds
+        return (min(max(x, left), right), min(max(y, bottom), top))
 
-        # Return the constrained x and y positions
-        return xPos, yPos
+    def _ClearRectangle(self) -> None:
+        # Hide the persistent selection rectangle, the single cleanup path for it, the
+        # shape is kept so clearing never frees and reallocates its vertex list
+        self.rectangle.visible = False
 
     def _CropImage(self, cropToScreen: bool) -> None:
         # If the sprite and image are valid
@@ -321,9 +569,9 @@ class ImageViewer():
                 screenX, screenY = 0, 0
 
                 # Get the screen width and height
-                screenWidth = self.mainWindow.width
-                screenHeight = self.mainWindow.height
-            elif self.rectangle:
+                screenWidth = self._windowWidth
+                screenHeight = self._windowHeight
+            elif self.rectangle.visible:
                 # Get the screen x and y coordinates of the rectangle
                 screenX, screenY = self.rectangle.position
 
@@ -335,8 +583,8 @@ class ImageViewer():
                 screenX, screenY = 0, 0
 
                 # Get the screen width and height
-                screenWidth = self.mainWindow.width
-                screenHeight = self.mainWindow.height
+                screenWidth = self._windowWidth
+                screenHeight = self._windowHeight
 
             # Ensure that the x and y of the rectangle are bottom left
             if screenWidth < 0:
@@ -349,24 +597,29 @@ class ImageViewer():
             screenWidth = abs(screenWidth)
             screenHeight = abs(screenHeight)
 
+            # Pull the image and sprite into locals for the repeated attribute reads
+            image = self.image
+            sprite = self.sprite
+
             # Get the screen x and y of the sprite origin
-            spriteOriginX, spriteOriginY = self.sprite.position
+            spriteOriginX, spriteOriginY = sprite.position
 
             # Find out how far into the image we are in left and right in screen pixels
             scaledImageX = screenX - spriteOriginX
             scaledImageY = screenY - spriteOriginY
 
-            # Get the sprite scaling factor
-            scalingFactor = self.sprite.scale
+            # Get the reciprocal of the sprite scaling factor so the conversions to image
+            # pixels below are multiplications rather than divisions
+            inverseScale = 1.0 / sprite.scale
 
             # Get the x, y, width and height in image pixels, ensuring the region is within the image bounds
-            imageX = int(max(scaledImageX / scalingFactor, 0))
-            imageY = int(max(scaledImageY / scalingFactor, 0))
-            imageWidth = int(min(screenWidth / scalingFactor, self.image.width))
-            imageHeight = int(min(screenHeight / scalingFactor, self.image.height))
+            imageX = int(max(scaledImageX * inverseScale, 0))
+            imageY = int(max(scaledImageY * inverseScale, 0))
+            imageWidth = int(min(screenWidth * inverseScale, image.width))
+            imageHeight = int(min(screenHeight * inverseScale, image.height))
 
             # Get this region of the image
-            imageRegion = self.image.get_region(imageX, imageY, imageWidth, imageHeight)
+            imageRegion = image.get_region(imageX, imageY, imageWidth, imageHeight)
 
             # Display the cropped image
             self._LoadImage(imageRegion)
@@ -377,8 +630,9 @@ class ImageViewer():
             # Get the filename of the original image
             originalFilename = self.images[self.currentImageIndex]
 
-            # Construct a new filename using .png as the suffix
-            newFilename = originalFilename.parent / f'{originalFilename.stem}_Modified {datetime.now()}.png'
+            # Construct a new filename using .png as the suffix, a nanosecond timestamp
+            # keeps rapid repeated saves unique without the datetime formatting cost
+            newFilename = originalFilename.parent / f'{originalFilename.stem}_Modified {time.time_ns()}.png'
 
             # Save the new file
             self.image.save(newFilename)
@@ -386,105 +640,99 @@ class ImageViewer():
             # Add the new image to the list
             self.images.insert(self.currentImageIndex + 1, newFilename)
 
-            # Make this image the current one
-            self.currentImageIndex = self.images.index(newFilename)
+            # Make this image the current one, it was inserted just after the current
+            # index so there is no need to search the list for it
+            self.currentImageIndex += 1
 
-    def _ShowBezierCurve(self) -> None:
-        # Zip the points with the next point to produce a list of lines
-        lineList = zip(self.pointList, self.pointList[1:])
-
-        # Create the Bezier curve
-        self.bezierCurve = [pyglet.shapes.Line(
-            x1 * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            y1 * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            x2 * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            y2 * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            batch=self.batch,
-            group=self.foreground,
-            color=(255, 0, 0),
-            width=3
-        ) for (x1, y1), (x2, y2) in lineList]
-
-        # Create a line showing the P0 -> P1 control line
-        self.p0p1Line = pyglet.shapes.Line(
-            self.p0[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p0[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            self.p1[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p1[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            batch=self.batch,
-            group=self.foreground,
-            color=(0, 255, 0),
-            width=5
-        )
-
-        # Create a circle for P1
-        self.p1Circle = pyglet.shapes.Circle(
-            self.p1[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p1[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            radius=10,
-            color=(0, 255, 0),
-            batch=self.batch,
-            group=self.foreground
-        )
-
-        # Create a line showing the P2 -> P3 control line
-        self.p2p3Line = pyglet.shapes.Line(
-            self.p2[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p2[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            self.p3[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p3[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            batch=self.batch,
-            group=self.foreground,
-            color=(0, 0, 255),
-            width=5
-        )
-
-        # Create a circle for P2
-        self.p2Circle = pyglet.shapes.Circle(
-            self.p2[0] * (self.mainWindow.width / 2) + (self.mainWindow.width / 4),
-            self.p2[1] * (self.mainWindow.height / 2) + (self.mainWindow.height / 4),
-            radius=10,
-            color=(0, 0, 255),
-            batch=self.batch,
-            group=self.foreground
-        )
+            # The list has grown, so update the maximum index to match
+            self.maxImageIndex = len(self.images) - 1
 
-    def _HideBezierCurve(self) -> None:
-        if self.bezierCurve:
-            # If the Bezier curve is shown, delete the lines making itb up
+    def _ShowBezierCurve(self) -> None:
+        # Make sure the shapes exist then position them from the current points
+        self._EnsureBezierShapes()
+        self._UpdateBezierShapes()
+
+        # Make the whole curve visible again
+        self._SetBezierShapesVisible(True)
+
+    def _EnsureBezierShapes(self) -> None:
+        # The shapes are created once and repositioned thereafter, recreating them on
+        # every control point drag would churn a vertex list per segment per mouse event
+        if self.bezierCurve is None:
+            # Create the line segments making up the Bezier curve
+            self.bezierCurve = [pyglet.shapes.Line(
+                0, 0, 0, 0,
+                batch=self.batch,
+                group=self.foreground,
+                color=(255, 0, 0),
+                width=3
+            ) for _ in range(len(self.pointList) - 1)]
+
+            # Create a line showing the P0 -> P1 control line
+            self.p0p1Line = pyglet.shapes.Line(0, 0, 0, 0, batch=self.batch, group=self.foreground, color=(0, 255, 0), width=5)
+
+            # Create a circle for P1
+            self.p1Circle = pyglet.shapes.Circle(0, 0, radius=10, color=(0, 255, 0), batch=self.batch, group=self.foreground)
+
+            # Create a line showing the P2 -> P3 control line
+            self.p2p3Line = pyglet.shapes.Line(0, 0, 0, 0, batch=self.batch, group=self.foreground, color=(0, 0, 255), width=5)
+
+            # Create a circle for P2
+            self.p2Circle = pyglet.shapes.Circle(0, 0, radius=10, color=(0, 0, 255), batch=self.batch, group=self.foreground)
+
+    def _UpdateBezierShapes(self) -> None:
+        if self.bezierCurve and self.p0p1Line and self.p1Circle and self.p2p3Line and self.p2Circle:
+            # Pull the precomputed curve space to screen space constants into locals
+            halfWidth = self._halfWidth
+            quarterWidth = self._quarterWidth
+            halfHeight = self._halfHeight
+            quarterHeight = self._quarterHeight
+
+            # Move each line segment to span its pair of curve points
+            for line, ((x1, y1), (x2, y2)) in zip(self.bezierCurve, zip(self.pointList, self.pointList[1:])):
+                line.x = x1 * halfWidth + quarterWidth
+                line.y = y1 * halfHeight + quarterHeight
+                line.x2 = x2 * halfWidth + quarterWidth
+                line.y2 = y2 * halfHeight + quarterHeight
+
+            # Move the P0 -> P1 control line
+            self.p0p1Line.x = self.p0[0] * halfWidth + quarterWidth
+            self.p0p1Line.y = self.p0[1] * halfHeight + quarterHeight
+            self.p0p1Line.x2 = self.p1[0] * halfWidth + quarterWidth
+            self.p0p1Line.y2 = self.p1[1] * halfHeight + quarterHeight
+
+            # Move the circle for P1
+            self.p1Circle.position = (self.p1[0] * halfWidth + quarterWidth, self.p1[1] * halfHeight + quarterHeight)
+
+            # Move the P2 -> P3 control line
+            self.p2p3Line.x = self.p2[0] * halfWidth + quarterWidth
+            self.p2p3Line.y = self.p2[1] * halfHeight + quarterHeight
+            self.p2p3Line.x2 = self.p3[0] * halfWidth + quarterWidth
+            self.p2p3Line.y2 = self.p3[1] * halfHeight + quarterHeight
+
+            # Move the circle for P2
+            self.p2Circle.position = (self.p2[0] * halfWidth + quarterWidth, self.p2[1] * halfHeight + quarterHeight)
+
+    def _SetBezierShapesVisible(self, visible: bool) -> None:
+        if self.bezierCurve and self.p0p1Line and self.p1Circle and self.p2p3Line and self.p2Circle:
+            # Flip the visible flag on each line segment
             for line in self.bezierCurve:
-                line.delete()
+                line.visible = visible
 
-            # Set the list to None
-            self.bezierCurve = None
+            # Flip the visible flag on the control lines and circles
+            self.p0p1Line.visible = visible
+            self.p1Circle.visible = visible
+            self.p2p3Line.visible = visible
+            self.p2Circle.visible = visible
 
-        if self.p0p1Line:
-            # Delete the line
-            self.p0p1Line.delete()
+        # Record the state for the key press and drag handlers
+        self._bezierVisible = visible
 
-            # set the line to None
-            self.p0p1Line = None
-
-        if self.p1Circle:
-            # Delete the circle
-            self.p1Circle.delete()
-
-            # set the circle to None
-            self.p1Circle = None
-
-        if self.p2p3Line:
-            # Delete the line
-            self.p2p3Line.delete()
-
-            # set the line to None
-            self.p2p3Line = None
-
-        if self.p2Circle:
-            # Delete the circle
-            self.p2Circle.delete()
-
-            # set the circle to None
-            self.p2Circle = None
+    def _HideBezierCurve(self) -> None:
+        # Hide the shapes in place rather than deleting them, pyglet zeroes the vertices
+        # of a hidden shape so toggling is far cheaper than rebuilding a vertex list per
+        # segment on every show
+        self._SetBezierShapesVisible(False)
 
     def on_draw(self):
         # Draw the batch
@@ -493,72 +741,42 @@ class ImageViewer():
     def on_key_press(self, symbol, modifiers):
         if modifiers & key.MOD_COMMAND:
             # If the Command button is pressed this is an image manipulation command
-            if symbol == key.S:
-                self._Sharpen()
-                return
-            elif symbol == key.B:
-                self._Blur()
-                return
-            elif symbol == key.C:
-                self._Contour()
-                return
-            elif symbol == key.D:
-                self._Detail()
-                return
-            elif symbol == key.E:
-                self._EdgeEnhance()
-                return
-            elif symbol == key.M:
-                self._Emboss()
-                return
-            elif symbol == key.F:
-                self._FindEdges()
-                return
-            elif symbol == key.O:
-                self._Smooth()
-                return
-            elif symbol == key.U:
-                self._UnsharpMask()
-                return
-            elif symbol == key.W:
-                self._BlackAndWhite()
-                return
-            elif symbol == key.RIGHT:
-                self._Colour(1.1)
-                return
-            elif symbol == key.LEFT:
-                self._Colour(0.9)
-                return
-            elif symbol == key.Z:
+            if symbol == key.Z:
                 self._RestoreOriginalImage()
                 return
-            else:
-                return
+
+            # Look the key up in the filter table and queue the matching filter
+            filterEntry = _FILTER_TABLE.get(symbol)
+
+            if filterEntry is not None:
+                filterFunction, args = filterEntry
+                self._EnqueueFilter(filterFunction, *args)
+            return
         elif modifiers & key.MOD_OPTION:
             if symbol == key.RIGHT:
-                self._Contrast(1.1)
+                self._EnqueueFilter(Contrast, 1.1)
                 return
             elif symbol == key.LEFT:
-                self._Contrast(0.9)
+                self._EnqueueFilter(Contrast, 0.9)
                 return
             else:
                 return
         elif modifiers & key.MOD_SHIFT:
             if symbol == key.RIGHT:
-                self._Brightness(1.1)
+                self._EnqueueFilter(Brightness, 1.1)
                 return
             elif symbol == key.LEFT:
-                self._Brightness(0.9)
+                self._EnqueueFilter(Brightness, 0.9)
                 return
             else:
                 return
         elif symbol == key.B:
-            if self.bezierCurve:
-                # If the Bezier curve is shown, delete it
+            if self._bezierVisible:
+                # If the Bezier curve is shown, hide it
                 self._HideBezierCurve()
                 return
             else:
-                # If the Bezier curve is not shown, create and show it
+                # If the Bezier curve is not shown, show it
                 self._ShowBezierCurve()
                 return
         elif symbol == key.UP:
@@ -571,13 +789,13 @@ class ImageViewer():
             # Exit this handler
             return
         # Ignore the request if the previous scroll is still ongoing
-        elif self.direction is None:
+        elif not self.direction:
             if symbol == key.RIGHT:
                 # Crop the image before setting the scroll direction
                 self._CropImage(cropToScreen=True)
 
                 # Set the scroll direction
-                self.direction = Direction.Forward
+                self.direction = FORWARD
 
                 # Increment the image index
                 self.currentImageIndex += 1
@@ -591,7 +809,7 @@ class ImageViewer():
                 self._CropImage(cropToScreen=True)
 
                 # Set the scroll direction
-                self.direction = Direction.Back
+                self.direction = BACK
 
                 # Decrement the image index
                 self.currentImageIndex -= 1
@@ -601,8 +819,8 @@ class ImageViewer():
                     # Set to the max index value if not
                     self.currentImageIndex = self.maxImageIndex
             elif symbol == key.C:
-                # Ensure the scroll direction is set to None
-                self.direction = None
+                # Ensure the scroll direction is set to idle
+                self.direction = 0
 
                 # Crop the image
                 self._CropImage(cropToScreen=False)
@@ -618,22 +836,21 @@ class ImageViewer():
                 # Return without reloading the image
                 return
             elif symbol == key.LCTRL:
-                # Clear the rectangle
-                if self.rectangle:
-                    self.rectangle.delete()
-                    self.rectangle = None
-
                 # Log that the left command key is held down
                 self.leftControlHeld = True
 
                 # Log the starting point of the rectangle
                 self.xStartDrag, self.yStartDrag = self._ConstrainToSprite(self.mouseX, self.mouseY)
 
-                # Get the crosshair cursor
-                cursor = self.mainWindow.get_system_mouse_cursor(self.mainWindow.CURSOR_CROSSHAIR)
+                # Reset the persistent selection rectangle to the start point and show
+                # it, the motion handler resizes it in place from here
+                self.rectangle.position = (self.xStartDrag, self.yStartDrag)
+                self.rectangle.width = 0
+                self.rectangle.height = 0
+                self.rectangle.visible = True
 
-                # Set the crosshair as the current cursor
-                self.mainWindow.set_mouse_cursor(cursor)
+                # Set the cached crosshair as the current cursor
+                self.mainWindow.set_mouse_cursor(self._crosshairCursor)
 
                 # Show the mouse without autohiding
                 self._ShowMouse(False)
@@ -648,9 +865,7 @@ class ImageViewer():
             return
 
         # Clear the rectangle
-        if self.rectangle:
-            self.rectangle.delete()
-            self.rectangle = None
+        self._ClearRectangle()
 
         # Load the new image
         self._LoadImage()
@@ -671,23 +886,14 @@ class ImageViewer():
         self.mouseX = x
         self.mouseY = y
 
-        if self.leftControlHeld:
+        if self.leftControlHeld and self.rectangle.visible:
             # Get the x and y position constrained to the image
             xPos, yPos = self._ConstrainToSprite(x, y)
 
-            # Draw the rectangle
-            self.rectangle = pyglet.shapes.Rectangle(
-                self.xStartDrag,
-                self.yStartDrag,
-                xPos - self.xStartDrag,
-                yPos - self.yStartDrag,
-                (30, 144, 255),
-                batch=self.batch,
-                group=self.foreground
-            )
-
-            # Set the opacity to 50%
-            self.rectangle.opacity = 128
+            # Resize the existing rectangle in place, updating the vertices of the shape
+            # is far cheaper than deleting and recreating it on every motion event
+            self.rectangle.width = xPos - self.xStartDrag
+            self.rectangle.height = yPos - self.yStartDrag
 
             # Show the mouse when it moves, not autohiding
             self._ShowMouse(False)
@@ -704,25 +910,52 @@ class ImageViewer():
                 # Scale the scroll value
                 scaleFactor = 1.1 if scroll_y < 0 else 1 / 1.1
 
-                # Work out how far the mouse is from the image bottom left
-                xMouseImagePos = x - self.sprite.x
-                yMouseImagePos = y - self.sprite.y
+                # Fold this event into the pending zoom, trackpads deliver many scroll
+                # events per frame and rebuilding the sprite vertices for each one is
+                # the dominant cost, so apply the combined zoom once per frame instead
+                self._pendingZoom *= scaleFactor
+                self._pendingFocus = (x, y)
 
-                # Scale this distance by the zoom factor
-                xScaledMouseImagePos = xMouseImagePos * scaleFactor
-                yScaledMouseImagePos = yMouseImagePos * scaleFactor
+                if not self._zoomScheduled:
+                    # Apply the accumulated zoom on the next clock tick
+                    self._zoomScheduled = True
+                    pyglet.clock.schedule_once(self._ApplyZoom, 0)
 
-                # Work out the new x and y of the image bottom left keeping the image static at the mouse position
-                self.sprite.x = self.sprite.x + xMouseImagePos - xScaledMouseImagePos
-                self.sprite.y = self.sprite.y + yMouseImagePos - yScaledMouseImagePos
+        # Clear the rectangle
+        self._ClearRectangle()
+
+    def _ApplyZoom(self, dt: float) -> None:
+        # Take the accumulated zoom and focus point and clear the pending state
+        scaleFactor = self._pendingZoom
+        x, y = self._pendingFocus
+        self._pendingZoom = 1.0
+        self._zoomScheduled = False
+
+        sprite = self.sprite
+
+        if sprite and scaleFactor != 1.0:
+            # Work out how far the mouse is from the image bottom left
+            xMouseImagePos = x - sprite.x
+            yMouseImagePos = y - sprite.y
+
+            # Scale this distance by the zoom factor
+            xScaledMouseImagePos = xMouseImagePos * scaleFactor
+            yScaledMouseImagePos = yMouseImagePos * scaleFactor
+
+            # Move and rescale the sprite in one update call so the quad vertices are
+            # rebuilt once rather than by each of the three property setters, keeping
+            # the image static at the mouse position
+            sprite.update(
+                x=sprite.x + xMouseImagePos - xScaledMouseImagePos,
+                y=sprite.y + yMouseImagePos - yScaledMouseImagePos,
+                scale=sprite.scale * scaleFactor,
+            )
 
-                # Rescale the sprite
-                self.sprite.scale = self.sprite.scale * scaleFactor
+            # Refresh the cached sprite edges for the motion event clamp
+            self._UpdateSpriteBounds()
 
-        # Clear the rectangle
-        if self.rectangle:
-            self.rectangle.delete()
-            self.rectangle = None
+            # The zoom lands after the input dispatch, redraw on the next frame
+            self.mainWindow.requestRedraw()
 
     def on_mouse_press(self, x, y, button, modifiers):
         if button == mouse.LEFT:
@@ -733,15 +966,10 @@ class ImageViewer():
             self.leftControlHeld = False
 
             # Clear the rectangle
-            if self.rectangle:
-                self.rectangle.delete()
-                self.rectangle = None
+            self._ClearRectangle()
 
-            # Get the hand cursor
-            cursor = self.mainWindow.get_system_mouse_cursor(self.mainWindow.CURSOR_HAND)
-
-            # Set the hand as the current cursor
-            self.mainWindow.set_mouse_cursor(cursor)
+            # Set the cached hand as the current cursor
+            self.mainWindow.set_mouse_cursor(self._handCursor)
         elif button == mouse.RIGHT:
             # Quit the application
             self.logQueue.put_nowait(('Exiting Pyglet application', logging.DEBUG))
@@ -759,34 +987,23 @@ class ImageViewer():
         self.draggingP2Circle = False
 
     def _MouseInCircle(self, x, y, circle: pyglet.shapes.Circle) -> bool:
-        # Get the x and y distance from the circle
-        xDelta = abs(x - circle.x)
-        yDelta = abs(y - circle.y)
+        # Get the x and y distance from the circle centre
+        xDelta = x - circle.x
+        yDelta = y - circle.y
 
-        # Use this to get the absolute distance from the circle
-        distanceFromCentre = math.sqrt(xDelta**2 + yDelta**2)
+        # Get the circle radius
+        radius = circle.radius
 
-        # Return True if this distance is less than the circle radius, otherwise False
-        return distanceFromCentre <= circle.radius
+        # Compare squared distances, the hit test does not need the square root
+        return (xDelta * xDelta) + (yDelta * yDelta) <= radius * radius
 
     def _ConstrainToScreen(self, x, y) -> tuple[float, float]:
-        # Constrain the point to the screen in x
-        if x < 0:
-            x = 0
-        elif x > self.mainWindow.width - 1:
-            x = self.mainWindow.width -1
-
-        # Constrain the point to the screen in y
-        if y < 0:
-            y = 0
-        elif y > self.mainWindow.height - 1:
-            y = self.mainWindow.height -1
-
-        # Return x and y as a tuple
-        return x, y
+        # Clamp the point to the screen with min/max rather than branching
+        return (min(max(x, 0), self._windowWidth - 1),
+            min(max(y, 0), self._windowHeight - 1))
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
-        if self.p1Circle and not self.draggingP2Circle and (self.draggingP1Circle or self._MouseInCircle(x, y, self.p1Circle)):
+        if self._bezierVisible and self.p1Circle and not self.draggingP2Circle and (self.draggingP1Circle or self._MouseInCircle(x, y, self.p1Circle)):
             # Set the draggin P1 flag to True
             self.draggingP1Circle = True
 
@@ -797,16 +1014,17 @@ class ImageViewer():
             # Constrain the circle to the screen
             self.p1Circle.position = self._ConstrainToScreen(self.p1Circle.x, self.p1Circle.y)
 
-            # Work out the new P1 control point position
-            self.p1 = (2 * (((self.p1Circle.x - self.mainWindow.width / 4) / self.mainWindow.width)), 
-                2 * (((self.p1Circle.y - self.mainWindow.height / 4) / self.mainWindow.height)))
+            # Work out the new P1 control point position, multiplying by the cached
+            # reciprocal rather than dividing by the window size
+            self.p1 = ((self.p1Circle.x - self._quarterWidth) * 2 * self._invWidth,
+                (self.p1Circle.y - self._quarterHeight) * 2 * self._invHeight)
 
             # Update the Bezier curve
             self._CreateBezierCurve()
 
-            # Show the new Bezier curve and control lines / points
-            self._ShowBezierCurve()
-        elif self.p2Circle and not self.draggingP1Circle and (self.draggingP2Circle or self._MouseInCircle(x, y, self.p2Circle)):
+            # Reposition the existing curve and control shapes from the new points
+            self._UpdateBezierShapes()
+        elif self._bezierVisible and self.p2Circle and not self.draggingP1Circle and (self.draggingP2Circle or self._MouseInCircle(x, y, self.p2Circle)):
             # Set the draggin P1 flag to True
             self.draggingP2Circle = True
 
@@ -817,167 +1035,60 @@ class ImageViewer():
             # Constrain the circle to the screen
             self.p2Circle.position = self._ConstrainToScreen(self.p2Circle.x, self.p2Circle.y)
 
-            # Work out the new P1 control point position
-            self.p2 = (2 * (((self.p2Circle.x - self.mainWindow.width / 4) / self.mainWindow.width)),
-                2 * (((self.p2Circle.y - self.mainWindow.height / 4) / self.mainWindow.height)))
+            # Work out the new P2 control point position, multiplying by the cached
+            # reciprocal rather than dividing by the window size
+            self.p2 = ((self.p2Circle.x - self._quarterWidth) * 2 * self._invWidth,
+                (self.p2Circle.y - self._quarterHeight) * 2 * self._invHeight)
 
             # Update the Bezier curve
             self._CreateBezierCurve()
 
-            # Show the new Bezier curve and control lines / points
-            self._ShowBezierCurve()
+            # Reposition the existing curve and control shapes from the new points
+            self._UpdateBezierShapes()
         elif self.sprite:
             # Update the x and y positions by the drag amounts
             self.sprite.x = self.sprite.x + dx
             self.sprite.y = self.sprite.y + dy
 
-            # Clear the rectangle
-            if self.rectangle:
-                self.rectangle.delete()
-                self.rectangle = None
-
-    def _Sharpen(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Sharpen(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Blur(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Blur(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Contour(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Contour(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Detail(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Detail(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _EdgeEnhance(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = EdgeEnhance(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Emboss(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Emboss(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _FindEdges(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = FindEdges(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
+            # Refresh the cached sprite edges for the motion event clamp
+            self._UpdateSpriteBounds()
 
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Smooth(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Smooth(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _UnsharpMask(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = UnsharpMask(self.image)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _BlackAndWhite(self) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Colour(self.image, 0.0)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
-
-    def _Colour(self, factor: float) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Colour(self.image, factor)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
+            # Clear the rectangle
+            self._ClearRectangle()
 
-    def _Contrast(self, factor: float) -> None:
+    def _EnqueueFilter(self, filterFunction, *args) -> None:
         if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Contrast(self.image, factor)
-
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
-
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
+            # Send the image and the filter to the filter server tagged with the current
+            # image generation, the UI keeps drawing while the filter runs on the server
+            # thread
+            self.filterServer.toFS.put_nowait((self.image, filterFunction, args, self._filterGeneration))
+
+            # Schedule a check for the filtered image
+            pyglet.clock.schedule_once(self._ReceiveFilteredImage, 1 / 60)
+
+    def _ReceiveFilteredImage(self, dt) -> None:
+        try:
+            # Check whether the filter server has finished
+            filteredImage, generation = self.filterServer.fromFS.get_nowait()
+        except queue.Empty:
+            # If not, check again next frame
+            pyglet.clock.schedule_once(self._ReceiveFilteredImage, 1 / 60)
+        else:
+            # Check that the filter actually succeeded and that the result still belongs
+            # to the displayed image, navigating while a filter is in flight would
+            # otherwise paint the previous image's pixels onto the current sprite
+            if filteredImage is not None and self.sprite is not None and generation == self._filterGeneration:
+                # Set the image to the filtered one
+                self.image = filteredImage
 
-    def _Brightness(self, factor: float) -> None:
-        if self.image and self.sprite:
-            # Create a Pyglet ImageData object from the bytes
-            self.image = Brightness(self.image, factor)
+                # Set the sprite image to the new image
+                self.sprite.image = self.image
 
-            # Set the sprite image to the new image
-            self.sprite.image = self.image
+                # Flag that this image can now be saved
+                self.imageCanBeSaved = True
 
-            # Flag that this image can now be saved
-            self.imageCanBeSaved = True
+                # The image changed off the event path, redraw on the next frame
+                self.mainWindow.requestRedraw()
 
     def _RestoreOriginalImage(self) -> None:
         if self.image and self.sprite:
@@ -994,5 +1105,8 @@ class ImageViewer():
             # Restore the original scaling
             self.sprite.scale = self.originalScale
 
+            # Refresh the cached sprite edges for the motion event clamp
+            self._UpdateSpriteBounds()
+
             # Flag that this image can no longer be saved
             self.imageCanBeSaved = False
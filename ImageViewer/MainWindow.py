@@ -42,6 +42,12 @@ class MainWindow(pyglet.window.Window):
         self.displayFps = False
         self.fpsDisplay = FPSDisplay(self)
 
+        # Draw the first frame, thereafter only redraw when something has changed
+        self.redrawNeeded = True
+
+        # Whether on_draw rendered a fresh frame into the back buffer since the last flip
+        self.frameDrawn = False
+
         if len(sys.argv) > 1:
             # If there is an image on the command line, get it
             imagePath = Path(sys.argv[1])
@@ -91,6 +97,9 @@ class MainWindow(pyglet.window.Window):
         # Put None onto the thumbnail server queue to stop the process
         self.fileBrowser.thumbnailServer.toTS.put_nowait((None, None))
 
+        # Put None onto the filter server queue to stop the thread
+        self.viewer.filterServer.toFS.put_nowait((None, None, None, None))
+
         # Log that the application is closing
         self.logQueue.put_nowait(('Exiting', logging.INFO))
 
@@ -100,7 +109,34 @@ class MainWindow(pyglet.window.Window):
         else:
             self.viewerMode = ViewerMode.FileBrowserMode
 
+        # The visible scene has changed
+        self.requestRedraw()
+
+    def on_resize(self, width, height):
+        # Let the base class update the viewport
+        super(MainWindow, self).on_resize(width, height)
+
+        # The window size changed, redraw on the next frame
+        self.redrawNeeded = True
+
+        # Refresh the viewer's cached window geometry, guarding against the resize
+        # events dispatched while the window itself is still being constructed
+        if getattr(self, 'viewer', None) is not None:
+            self.viewer.on_resize(width, height)
+
+    def requestRedraw(self) -> None:
+        # Mark the scene as changed so the next on_draw actually draws it
+        self.redrawNeeded = True
+
     def on_draw(self):
+        # Skip the clear and batch draw while nothing has changed, unless the FPS
+        # counter is shown as that updates every frame
+        if not self.redrawNeeded and not self.displayFps:
+            return
+
+        # The scene is about to be drawn
+        self.redrawNeeded = False
+
         # Clear the window
         self.clear()
 
@@ -115,7 +151,21 @@ class MainWindow(pyglet.window.Window):
         if self.displayFps:
             self.fpsDisplay.draw()
 
+        # The back buffer now holds a fresh frame, let the next flip present it
+        self.frameDrawn = True
+
+    def flip(self):
+        # The event loop flips after every on_draw dispatch even when on_draw skipped
+        # drawing, which would alternate between the two most recent buffers and strobe
+        # any stale frame, so only present the back buffer when a fresh frame is in it
+        if getattr(self, 'frameDrawn', True):
+            self.frameDrawn = False
+            super(MainWindow, self).flip()
+
     def on_key_press(self, symbol, modifiers):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if symbol == key.ESCAPE:
             # Quit the application
             self.logQueue.put_nowait(('ESC Pressed, Exiting Pyglet application', logging.DEBUG))
@@ -129,29 +179,47 @@ class MainWindow(pyglet.window.Window):
             self.fileBrowser.on_key_press(symbol, modifiers)
 
     def on_key_release(self, symbol, modifiers):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_key_release(symbol, modifiers)
 
     def on_mouse_motion(self, x, y, dx, dy):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_mouse_motion(x, y, dx, dy)
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_mouse_scroll(x, y, scroll_x, scroll_y)
         else:
             self.fileBrowser.on_mouse_scroll(x, y, scroll_x, scroll_y)
 
     def on_mouse_press(self, x, y, button, modifiers):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_mouse_press(x, y, button, modifiers)
         else:
             self.fileBrowser.on_mouse_press(x, y, button, modifiers)
 
     def on_mouse_release(self, x, y, button, modifiers):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_mouse_release(x, y, button, modifiers)
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        # Input can change the scene, redraw on the next frame
+        self.requestRedraw()
+
         if self.viewerMode == ViewerMode.ImageViewerMode:
             self.viewer.on_mouse_drag(x, y, dx, dy, buttons, modifiers)
@@ -31,16 +31,26 @@ class ThumbnailServer(threading.Thread):
             self.log('Starting Thumbnail Server', logging.DEBUG)
 
             # Run until told to stop
-            while True:
-                # Receive the imagePath, the path for container indexing and the size of the container
-                imagePath, containerSize = self.toTS.get()
-
-                if imagePath is not None and containerSize is not None:
-                    # Add a job to the process pool to load and thumbnail the image
-                    pool.submit(self.LoadImage, imagePath, containerSize)
-                else:
-                    # If the application is closing, exit  the loop
-                    break
+            running = True
+
+            while running:
+                # Block for the first request, then drain anything else already queued so that
+                # opening a folder is handled as a single batch rather than one wake up per thumbnail
+                requests = [self.toTS.get()]
+
+                while True:
+                    try:
+                        requests.append(self.toTS.get_nowait())
+                    except queue.Empty:
+                        break
+
+                for imagePath, containerSize in requests:
+                    if imagePath is not None and containerSize is not None:
+                        # Add a job to the process pool to load and thumbnail the image
+                        pool.submit(self.LoadImage, imagePath, containerSize)
+                    else:
+                        # If the application is closing, exit the loop
+                        running = False
 
     def log(self, message: str, level: int) -> None:
         # Send the message and level to the log queue